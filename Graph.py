@@ -1,12 +1,90 @@
 from Vertex import *
+import heapq
+import itertools
 import math
+import threading
+from array import array
+import numpy as np
+
+# Nombre d'arbres de plus courts chemins gardés en cache par graphe
+TREE_CACHE_SIZE = 4
+
+def bgr(intensity):
+    """
+    Renvoie les trois canaux d'une intensité, qu'elle soit un dictionnaire ou une vue sur l'image.
+
+    Arguments:
+        intensity: dict | numpy.ndarray - Intensité du pixel au format BGR
+
+    Retourne:
+        tuple: Les valeurs (B, G, R)
+    """
+    if isinstance(intensity, dict):
+        return intensity["B"], intensity["G"], intensity["R"]
+    return intensity[0], intensity[1], intensity[2]
+
+class SearchWorkspace:
+    def __init__(self, size=0):
+        """
+        Initialise des tableaux de distances et de pères réutilisables d'une recherche à l'autre.
+
+        Une case n'est valable que si son tampon (stamp) vaut la génération courante :
+        passer à la génération suivante efface tout en temps constant.
+
+        Arguments:
+            size: int - Nombre de sommets à prévoir
+        """
+        self.distances = array('d', bytes(8 * size))
+        self.parents = array('q', bytes(8 * size))
+        self.stamps = array('Q', bytes(8 * size))
+        self.generation = 0
+
+    def reset(self, size):
+        """
+        Commence une nouvelle recherche, en agrandissant les tableaux si le graphe a grandi.
+
+        Arguments:
+            size: int - Nombre de sommets du graphe
+        """
+        missing = size - len(self.stamps)
+        if missing > 0:
+            self.distances.extend(array('d', bytes(8 * missing)))
+            self.parents.extend(array('q', bytes(8 * missing)))
+            self.stamps.extend(array('Q', bytes(8 * missing)))
+        self.generation += 1
+
+    def path(self, index):
+        """
+        Reconstruit le chemin menant à un sommet atteint par la dernière recherche.
+
+        Arguments:
+            index: int - Indice du sommet d'arrivée
+
+        Retourne:
+            list: Les indices des sommets, du départ à l'arrivée
+        """
+        length = 1
+        current = index
+        while self.parents[current] != -1:
+            current = self.parents[current]
+            length += 1
+        # Remplissage depuis la fin : ni append ni reverse
+        indices = [0] * length
+        for row in range(length - 1, -1, -1):
+            indices[row] = index
+            index = self.parents[index]
+        return indices
 
 class Graph:
     def __init__(self) :
         """
-        Initialise une liste pour sauvegarder les sommets du graphe.
+        Initialise une liste pour sauvegarder les sommets du graphe, un index par position,
+        un cache des arbres de plus courts chemins et un espace de recherche par thread.
         """
         self.vertices = list()
+        self.positions = dict()
+        self.trees = dict()
+        self.local = threading.local()
 
     def get_vertex(self, line_index, column_index):
         """
@@ -19,10 +97,7 @@ class Graph:
         Retourne:
             Vertex: Le sommet correspondant aux coordonnées ou None s'il n'existe pas
         """
-        for v in self.vertices:
-            if(v.line == line_index and v.column == column_index):
-                return v
-        return None
+        return self.positions.get((line_index, column_index))
 
     def add_vertex(self, line, column, intensity):
         """
@@ -31,16 +106,32 @@ class Graph:
         Arguments:
             line: int - Index de ligne du sommet
             column: int - Index de colonne du sommet
-            intensity: dict - Dictionnaire représentant l'intensité du pixel au format RGB
+            intensity: dict | numpy.ndarray - Intensité du pixel au format BGR (dictionnaire ou vue sur l'image)
 
         Retourne:
             bool: True si le sommet a été ajouté avec succès, False sinon
         """
         if (self.get_vertex(line, column) is None):
-            self.vertices.append(Vertex(line, column, intensity))
+            vertex = Vertex(line, column, intensity)
+            vertex.index = len(self.vertices)
+            self.vertices.append(vertex)
+            self.positions[(line, column)] = vertex
+            self.trees.clear()
             return True
         return False
 
+    def contains(self, vertex):
+        """
+        Vérifie en temps constant qu'un sommet appartient au graphe.
+
+        Arguments:
+            vertex: Vertex - Le sommet à vérifier
+
+        Retourne:
+            bool: True si le sommet est celui enregistré à sa position, False sinon
+        """
+        return self.positions.get((vertex.line, vertex.column)) is vertex
+
     def add_edge(self, vertex1, vertex2):
         """
         Ajoute une arête entre deux sommets du graphe.
@@ -53,71 +144,351 @@ class Graph:
             bool: True si l'arête a été ajoutée avec succès, False sinon
         """
         if (isinstance(vertex1, Vertex) and isinstance(vertex2, Vertex)) :
-            if (vertex1 in self.vertices and vertex2 in self.vertices) :
+            if (self.contains(vertex1) and self.contains(vertex2)) :
                 # Les intensités des arêtes ont été normalisées pour éviter les erreurs d'overflow
                 max_intensity = 255
-                normalized_intensity_1 = {
-                    "B": vertex1.intensity["B"] / max_intensity,
-                    "G": vertex1.intensity["G"] / max_intensity,
-                    "R": vertex1.intensity["R"] / max_intensity
-                }
-                normalized_intensity_2 = {
-                    "B": vertex2.intensity["B"] / max_intensity,
-                    "G": vertex2.intensity["G"] / max_intensity,
-                    "R": vertex2.intensity["R"] / max_intensity
-                }
+                blue_1, green_1, red_1 = bgr(vertex1.intensity)
+                blue_2, green_2, red_2 = bgr(vertex2.intensity)
                 # L'intensité en RGB est sur 3 dimensions, donc on utilise la distance euclidienne pour avoir une seul valeur pour le poids de l'arête
                 distance = math.sqrt(
-                    (normalized_intensity_1["B"] - normalized_intensity_2["B"]) ** 2 +
-                    (normalized_intensity_1["G"] - normalized_intensity_2["G"]) ** 2 +
-                    (normalized_intensity_1["R"] - normalized_intensity_2["R"]) ** 2
+                    (blue_1 / max_intensity - blue_2 / max_intensity) ** 2 +
+                    (green_1 / max_intensity - green_2 / max_intensity) ** 2 +
+                    (red_1 / max_intensity - red_2 / max_intensity) ** 2
                 )
                 vertex1.add_neighbor((vertex2, distance))
                 vertex2.add_neighbor((vertex1, distance))
+                self.trees.clear()
                 return  True
         return False
 
-    def dijkstra(self, start, finish):
+    def dijkstra(self, start, finish, workspace=None):
         """
         Implémente l'algorithme de Dijkstra pour trouver le chemin le plus court entre deux sommets.
 
         Arguments:
             debut: Vertex - Sommet de départ
             fin: Vertex - Sommet d'arrivée
+            workspace: SearchWorkspace - Espace de travail à réutiliser (celui du thread courant par défaut)
 
         Retourne:
             tuple: Le chemin le plus court sous forme de liste de sommets et la distance finale
         """
-        # L'algorithme implémenté est basé sur l'algorithme de Dijkstra vu au cours
-        distances = {vertex: float('inf') for vertex in self.vertices}
-        fathers = {vertex : None for vertex in self.vertices}
-        distances[start] = 0
-        current_vertex = start
-        visited_vertices = set()
-
-        while current_vertex != finish:
-            visited_vertices.add(current_vertex)
-            for neighbor, weight in current_vertex.neighbors:
-                distance = distances[current_vertex] + weight
-                if distance < distances[neighbor]:
+        workspace, reached = self._search(start, finish, workspace)
+        if not reached:
+            return [finish], float('inf')
+        indices = workspace.path(finish.index)
+        return [self.vertices[index] for index in indices], workspace.distances[finish.index] * 255
+
+    def shortest_path(self, start, finish, workspace=None):
+        """
+        Cherche le plus court chemin et le renvoie sous forme de tableau de coordonnées.
+
+        Arguments:
+            start: Vertex - Sommet de départ
+            finish: Vertex - Sommet d'arrivée
+            workspace: SearchWorkspace - Espace de travail à réutiliser (celui du thread courant par défaut)
+
+        Retourne:
+            tuple: Le chemin sous forme de tableau (N, 2) de coordonnées (ligne, colonne) et la distance finale
+        """
+        workspace, reached = self._search(start, finish, workspace)
+        if not reached:
+            return np.array([[finish.line, finish.column]]), float('inf')
+        indices = workspace.path(finish.index)
+        path = np.empty((len(indices), 2), dtype=np.int64)
+        for row, index in enumerate(indices):
+            vertex = self.vertices[index]
+            path[row, 0] = vertex.line
+            path[row, 1] = vertex.column
+        return path, workspace.distances[finish.index] * 255
+
+    def _search(self, start, finish, workspace):
+        """
+        Dijkstra avec un tas, sur un espace de travail réinitialisé en temps constant : le coût
+        d'une recherche dépend de la zone explorée et non de la taille de l'image.
+
+        Retourne:
+            tuple: L'espace de travail utilisé et True si l'arrivée a été atteinte
+        """
+        if workspace is None:
+            workspace = getattr(self.local, "workspace", None)
+            if workspace is None:
+                workspace = self.local.workspace = SearchWorkspace(len(self.vertices))
+        workspace.reset(len(self.vertices))
+
+        distances = workspace.distances
+        parents = workspace.parents
+        stamps = workspace.stamps
+        generation = workspace.generation
+        vertices = self.vertices
+        target = finish.index
+
+        stamps[start.index] = generation
+        distances[start.index] = 0.0
+        parents[start.index] = -1
+        # À distance égale, le plus petit indice sort en premier, comme dans l'ordre des sommets
+        heap = [(0.0, start.index)]
+        while heap:
+            distance, index = heapq.heappop(heap)
+            if index == target:
+                return workspace, True
+            if distance > distances[index]:
+                continue
+            for neighbor, weight in vertices[index].neighbors:
+                neighbor_index = neighbor.index
+                new_distance = distance + weight
+                if stamps[neighbor_index] != generation or new_distance < distances[neighbor_index]:
+                    stamps[neighbor_index] = generation
+                    distances[neighbor_index] = new_distance
+                    parents[neighbor_index] = index
+                    heapq.heappush(heap, (new_distance, neighbor_index))
+        return workspace, False
+
+    def edge_weight(self, vertex1, vertex2):
+        """
+        Récupère le poids de l'arête entre deux sommets voisins.
+
+        Arguments:
+            vertex1: Vertex - Premier sommet
+            vertex2: Vertex - Deuxième sommet
+
+        Retourne:
+            float: Le poids de l'arête, ou l'infini si les sommets ne sont pas voisins
+        """
+        for neighbor, weight in vertex1.neighbors:
+            if neighbor is vertex2:
+                return weight
+        return float('inf')
+
+    def path_cost(self, path):
+        """
+        Calcule le coût d'un chemin, dans les mêmes unités que dijkstra.
+
+        Arguments:
+            path: list - Liste de sommets
+
+        Retourne:
+            float: Le coût du chemin
+        """
+        return sum(self.edge_weight(path[k], path[k + 1]) for k in range(len(path) - 1)) * 255
+
+    def shortest_path_tree(self, root):
+        """
+        Calcule (ou récupère dans le cache) l'arbre des plus courts chemins issu d'un sommet.
+
+        Le graphe étant non orienté, les distances depuis la racine sont aussi les distances
+        vers la racine.
+
+        Arguments:
+            root: Vertex - Racine de l'arbre
+
+        Retourne:
+            tuple: Les distances (non multipliées par 255) et les pères de chaque sommet atteint
+        """
+        if root in self.trees:
+            return self.trees[root]
+
+        distances = {root: 0}
+        fathers = {root: None}
+        counter = itertools.count()
+        heap = [(0, next(counter), root)]
+        while heap:
+            distance, _, vertex = heapq.heappop(heap)
+            if distance > distances[vertex]:
+                continue
+            for neighbor, weight in vertex.neighbors:
+                new_distance = distance + weight
+                if new_distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = new_distance
+                    fathers[neighbor] = vertex
+                    heapq.heappush(heap, (new_distance, next(counter), neighbor))
+
+        if len(self.trees) >= TREE_CACHE_SIZE:
+            del self.trees[next(iter(self.trees))]
+        self.trees[root] = (distances, fathers)
+        return distances, fathers
+
+    def astar(self, start, finish, heuristic, removed_vertices=(), removed_edges=(), extra=None, tree=None):
+        """
+        Recherche A* entre deux sommets, en ignorant des sommets et des arêtes.
+
+        Si `tree` est donné, `heuristic` doit être la distance exacte à l'arrivée dans le graphe
+        complet : dès qu'un sommet dont le chemin de l'arbre n'utilise rien d'interdit est
+        atteint, ce chemin est optimal et la recherche s'arrête.
+
+        Arguments:
+            start: Vertex - Sommet de départ
+            finish: Vertex - Sommet d'arrivée
+            heuristic: dict - Minorant de la distance de chaque sommet à l'arrivée (ou tout objet muni d'une méthode get)
+            removed_vertices: set - Sommets interdits
+            removed_edges: set - Arêtes interdites, sous forme de couples (sommet, sommet)
+            extra: dict - Surcoût ajouté au poids de certaines arêtes
+            tree: dict - Pères de l'arbre des plus courts chemins issu de l'arrivée
+
+        Retourne:
+            tuple: Le chemin sous forme de liste de sommets (None si aucun) et son coût de recherche,
+            non multiplié par 255
+        """
+        infinity = float('inf')
+        distances = {start: 0}
+        fathers = {start: None}
+        closed = set()
+        valid = dict()
+        counter = itertools.count()
+        heap = [(heuristic.get(start, infinity), next(counter), start)]
+        while heap:
+            _, _, vertex = heapq.heappop(heap)
+            if vertex in closed:
+                continue
+            if vertex is finish or (tree is not None and self._tree_is_valid(vertex, tree, removed_vertices, removed_edges, valid)):
+                path = [vertex]
+                while fathers[path[-1]] is not None:
+                    path.append(fathers[path[-1]])
+                path.reverse()
+                while path[-1] is not finish:
+                    path.append(tree[path[-1]])
+                # Avec des arêtes de poids nul, le raccourci peut repasser par un sommet du début
+                if len(set(path)) == len(path):
+                    return path, distances[vertex] + (heuristic[vertex] if vertex is not finish else 0)
+            closed.add(vertex)
+            for neighbor, weight in vertex.neighbors:
+                if neighbor in closed or neighbor in removed_vertices or (vertex, neighbor) in removed_edges:
+                    continue
+                if extra:
+                    weight += extra.get((vertex, neighbor), 0)
+                distance = distances[vertex] + weight
+                if distance < distances.get(neighbor, infinity):
+                    estimate = heuristic.get(neighbor, infinity)
+                    if estimate == infinity:
+                        continue
                     distances[neighbor] = distance
-                    fathers[neighbor] = current_vertex
+                    fathers[neighbor] = vertex
+                    heapq.heappush(heap, (distance + estimate, next(counter), neighbor))
+        return None, infinity
 
-            unvisited_distances = {vertex: distances[vertex] for vertex in distances if vertex not in visited_vertices}
-            
-            if not unvisited_distances:
+    def _tree_is_valid(self, vertex, tree, removed_vertices, removed_edges, valid):
+        """
+        Vérifie que le chemin de l'arbre entre un sommet et la racine n'utilise ni sommet ni
+        arête interdits. Les résultats sont mémorisés dans `valid` pour tous les sommets parcourus.
+        """
+        chain = []
+        current = vertex
+        while True:
+            if current in valid:
+                result = valid[current]
+                break
+            chain.append(current)
+            if current in removed_vertices:
+                result = False
+                break
+            if current not in tree:
+                result = False
+                break
+            father = tree[current]
+            if father is None:
+                result = True
                 break
+            if (current, father) in removed_edges:
+                result = False
+                break
+            current = father
+        for visited in chain:
+            valid[visited] = result
+        return result
+
+    def k_shortest_paths(self, start, finish, k):
+        """
+        Trouve les k plus courts chemins sans boucle entre deux sommets (algorithme de Yen).
 
-            current_vertex = min(unvisited_distances, key=unvisited_distances.get)
+        Les recherches de déviation sont des A* guidés par l'arbre des plus courts chemins
+        issu de l'arrivée, calculé une seule fois : elles s'arrêtent dès qu'elles rejoignent
+        une branche de l'arbre encore autorisée.
 
-            if distances[current_vertex] == float('inf'):
+        Arguments:
+            start: Vertex - Sommet de départ
+            finish: Vertex - Sommet d'arrivée
+            k: int - Nombre de chemins voulus
+
+        Retourne:
+            list: Jusqu'à k couples (chemin, coût), par coût croissant
+        """
+        heuristic, tree = self.shortest_path_tree(finish)
+        # L'arbre issu de l'arrivée ne contient que les sommets qui peuvent l'atteindre
+        if k < 1 or heuristic.get(start, float('inf')) == float('inf'):
+            return []
+        path, cost = self.astar(start, finish, heuristic, tree=tree)
+        if path is None:
+            return []
+
+        paths = [(path, cost)]
+        seen = {tuple(path)}
+        candidates = []
+        counter = itertools.count()
+        while len(paths) < k:
+            previous, _ = paths[-1]
+            root_cost = 0
+            # Chemins partageant la racine courante et sommets de la racine, mis à jour
+            # au fil de la boucle plutôt que recalculés à chaque déviation
+            sharing = [other for other, _ in paths]
+            removed_vertices = set()
+            for i in range(len(previous) - 1):
+                spur = previous[i]
+                sharing = [other for other in sharing if len(other) > i + 1 and other[i] is spur]
+                # Interdire les arêtes déjà empruntées après la même racine, et la racine elle-même
+                removed_edges = set()
+                for other in sharing:
+                    removed_edges.add((other[i], other[i + 1]))
+                    removed_edges.add((other[i + 1], other[i]))
+                spur_path, spur_cost = self.astar(spur, finish, heuristic, removed_vertices, removed_edges, tree=tree)
+                if spur_path is not None:
+                    candidate = previous[:i] + spur_path
+                    if tuple(candidate) not in seen:
+                        seen.add(tuple(candidate))
+                        heapq.heappush(candidates, (root_cost + spur_cost, next(counter), candidate))
+                root_cost += self.edge_weight(previous[i], previous[i + 1])
+                removed_vertices.add(spur)
+
+            if not candidates:
                 break
+            cost, _, path = heapq.heappop(candidates)
+            paths.append((path, cost))
+
+        return [(path, cost * 255) for path, cost in paths]
+
+    def diverse_paths(self, start, finish, k, penalty=1.0):
+        """
+        Trouve jusqu'à k chemins alternatifs qui se chevauchent peu.
 
-        path = [finish]
-        final_distance = distances[finish] * 255
-        while fathers[finish] is not None:
-            path.append(fathers[finish])
-            finish = fathers[finish]
+        Après chaque chemin, ses arêtes reçoivent un surcoût égal à `penalty` fois le poids
+        moyen d'une arête du chemin, ce qui pousse les recherches suivantes à s'en écarter.
 
-        path.reverse()
-        return path, final_distance
\ No newline at end of file
+        Arguments:
+            start: Vertex - Sommet de départ
+            finish: Vertex - Sommet d'arrivée
+            k: int - Nombre de chemins voulus
+            penalty: float - Intensité de la pénalité de chevauchement
+
+        Retourne:
+            list: Jusqu'à k couples (chemin, coût réel), dans l'ordre où ils ont été trouvés
+        """
+        heuristic, _ = self.shortest_path_tree(finish)
+        extra = dict()
+        paths = []
+        seen = set()
+        # Un chemin déjà trouvé peut revenir tant que la pénalité ne suffit pas à l'écarter
+        for _ in range(2 * k):
+            if len(paths) >= k:
+                break
+            path, _ = self.astar(start, finish, heuristic, extra=extra)
+            if path is None:
+                break
+            cost = self.path_cost(path)
+            if tuple(path) not in seen:
+                seen.add(tuple(path))
+                paths.append((path, cost))
+            if len(path) > 1:
+                surcharge = penalty * cost / 255 / (len(path) - 1)
+                for vertex1, vertex2 in zip(path, path[1:]):
+                    extra[(vertex1, vertex2)] = extra.get((vertex1, vertex2), 0) + surcharge
+                    extra[(vertex2, vertex1)] = extra.get((vertex2, vertex1), 0) + surcharge
+        return paths
\ No newline at end of file
@@ -0,0 +1,70 @@
+import os
+import numpy as np
+import cv2 as cv
+
+# Taille (largeur, hauteur) à laquelle les images sont redimensionnées
+IMAGE_SIZE = (21, 21)
+
+def read_image(source, size=IMAGE_SIZE):
+    """
+    Décode une image une seule fois et renvoie un tampon BGR contigu, partagé ensuite
+    par la construction du graphe et l'affichage.
+
+    Arguments:
+        source: str | os.PathLike | bytes | bytearray | memoryview | numpy.ndarray - Chemin
+            de l'image, image encodée en mémoire (PNG, JPEG...) ou tableau déjà décodé
+        size: tuple - Taille (largeur, hauteur) voulue, ou None pour garder la taille d'origine
+
+    Retourne:
+        numpy.ndarray: L'image au format BGR (hauteur x largeur x 3, uint8)
+    """
+    if isinstance(source, np.ndarray):
+        image = source
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        # np.frombuffer ne copie pas les octets : seul le décodage alloue l'image
+        image = cv.imdecode(np.frombuffer(source, dtype=np.uint8), cv.IMREAD_COLOR)
+    else:
+        image = cv.imread(os.fspath(source))
+    if image is None:
+        raise ValueError(f"Impossible de lire l'image : {source if isinstance(source, (str, os.PathLike)) else type(source).__name__}")
+
+    image = to_bgr(image)
+    # Un tableau déjà à la bonne taille est réutilisé tel quel, sans copie
+    if size is not None and (image.shape[1], image.shape[0]) != tuple(size):
+        image = cv.resize(image, tuple(size))
+    return np.ascontiguousarray(image)
+
+def to_bgr(image):
+    """
+    Ramène une image à trois canaux BGR sur 8 bits.
+
+    Arguments:
+        image: numpy.ndarray - Image en niveaux de gris, BGR ou BGRA
+
+    Retourne:
+        numpy.ndarray: L'image BGR, sans copie si elle l'était déjà
+    """
+    if image.dtype != np.uint8:
+        raise ValueError(f"Type de pixel non supporté : {image.dtype} (uint8 attendu)")
+    if image.ndim == 2:
+        return cv.cvtColor(image, cv.COLOR_GRAY2BGR)
+    if image.ndim == 3 and image.shape[2] == 3:
+        return image
+    if image.ndim == 3 and image.shape[2] == 4:
+        return cv.cvtColor(image, cv.COLOR_BGRA2BGR)
+    raise ValueError(f"Forme d'image non supportée : {image.shape}")
+
+def map_raw(path, shape, dtype=np.uint8, offset=0):
+    """
+    Projette en mémoire un fichier de pixels bruts, sans le lire entièrement.
+
+    Arguments:
+        path: str - Chemin du fichier brut
+        shape: tuple - Forme de l'image (hauteur, largeur) ou (hauteur, largeur, canaux)
+        dtype: numpy.dtype - Type des pixels
+        offset: int - Position en octets du premier pixel (taille d'un éventuel en-tête)
+
+    Retourne:
+        numpy.memmap: Tableau en lecture seule, à passer à read_image
+    """
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=tuple(shape))
\ No newline at end of file
@@ -0,0 +1,224 @@
+import hashlib
+import time
+import numpy as np
+
+from Graph import bgr
+
+class _LandmarkHeuristic:
+    """
+    Minorant ALT de la distance à un sommet d'arrivée, calculé à la demande.
+    """
+    def __init__(self, index, finish):
+        self.index = index
+        self.target = index.distances[index.indices[finish]]
+
+    def get(self, vertex, default=None):
+        row = self.index.distances[self.index.indices[vertex]]
+        # Inégalité triangulaire : |d(l, t) - d(l, v)| <= d(v, t) pour chaque repère l.
+        # fmax ignore les NaN (inf - inf) des sommets non reliés à un repère.
+        bound = np.fmax.reduce(np.abs(self.target - row))
+        return default if np.isnan(bound) else float(bound)
+
+def fingerprint(graph):
+    """
+    Calcule l'empreinte d'un graphe : nombre, ordre, coordonnées et intensités des sommets.
+    Deux graphes de même empreinte proviennent de la même image.
+
+    Arguments:
+        graph: Graph - Le graphe
+
+    Retourne:
+        str: L'empreinte SHA-256 en hexadécimal
+    """
+    coordinates = np.array([(vertex.line, vertex.column) for vertex in graph.vertices], dtype=np.int64)
+    intensities = np.array([bgr(vertex.intensity) for vertex in graph.vertices], dtype=np.float64)
+    digest = hashlib.sha256(len(graph.vertices).to_bytes(8, "little"))
+    digest.update(coordinates.tobytes())
+    digest.update(intensities.tobytes())
+    return digest.hexdigest()
+
+class LandmarkIndex:
+    def __init__(self, graph, landmarks, distances, build_time=0.0):
+        """
+        Initialise un index de repères (landmarks) sur un graphe.
+
+        Arguments:
+            graph: Graph - Le graphe indexé
+            landmarks: list - Coordonnées (ligne, colonne) des repères
+            distances: numpy.ndarray - Distances (non multipliées par 255) de chaque sommet à
+                chaque repère, une ligne par sommet dans l'ordre de graph.vertices
+            build_time: float - Durée de construction de l'index, en secondes
+        """
+        if distances.shape != (len(graph.vertices), len(landmarks)):
+            raise ValueError(f"L'index ({distances.shape}) ne correspond pas au graphe ({len(graph.vertices)} sommets)")
+        self.graph = graph
+        self.landmarks = [tuple(landmark) for landmark in landmarks]
+        self.distances = distances
+        self.build_time = build_time
+        self.indices = {vertex: k for k, vertex in enumerate(graph.vertices)}
+
+    @classmethod
+    def build(cls, graph, count=8):
+        """
+        Choisit les repères et calcule leurs distances à tous les sommets.
+
+        Les repères sont choisis par le point le plus éloigné : chaque nouveau repère est le
+        sommet le plus loin des repères déjà choisis, ce qui les place sur les bords de l'image.
+
+        Arguments:
+            graph: Graph - Le graphe à indexer
+            count: int - Nombre de repères
+
+        Retourne:
+            LandmarkIndex: L'index construit
+        """
+        started = time.perf_counter()
+        count = min(count, len(graph.vertices))
+        distances = np.empty((len(graph.vertices), count))
+        landmarks = []
+        # La distance au repère le plus proche guide le choix du repère suivant
+        nearest = cls._tree_distances(graph, graph.vertices[0]) if graph.vertices else None
+        for k in range(count):
+            candidates = np.where(np.isfinite(nearest), nearest, -1)
+            landmark = graph.vertices[int(np.argmax(candidates))]
+            landmarks.append((landmark.line, landmark.column))
+            distances[:, k] = cls._tree_distances(graph, landmark)
+            nearest = np.minimum(nearest, distances[:, k]) if k else distances[:, k].copy()
+        return cls(graph, landmarks, distances, time.perf_counter() - started)
+
+    @staticmethod
+    def _tree_distances(graph, root):
+        """
+        Calcule les distances d'un sommet à tous les autres, dans l'ordre de graph.vertices.
+        """
+        cached = root in graph.trees
+        tree, _ = graph.shortest_path_tree(root)
+        # Les arbres des repères ne servent qu'une fois : inutile d'occuper le cache du graphe
+        if not cached:
+            graph.trees.pop(root, None)
+        return np.array([tree.get(vertex, np.inf) for vertex in graph.vertices])
+
+    def save(self, path):
+        """
+        Enregistre l'index sur le disque au format .npz.
+
+        Arguments:
+            path: str - Chemin du fichier
+        """
+        np.savez(path, landmarks=np.array(self.landmarks, dtype=np.int64).reshape(-1, 2),
+                 distances=self.distances, build_time=self.build_time,
+                 fingerprint=fingerprint(self.graph))
+
+    @classmethod
+    def load(cls, graph, path):
+        """
+        Charge un index enregistré pour le graphe de la même image.
+
+        Un index construit sur une autre image donnerait des minorants faux, donc des chemins
+        et des coûts faux sans erreur visible : l'empreinte du graphe est vérifiée.
+
+        Arguments:
+            graph: Graph - Le graphe indexé
+            path: str - Chemin du fichier
+
+        Retourne:
+            LandmarkIndex: L'index chargé
+        """
+        with np.load(path) as data:
+            if "fingerprint" not in data or str(data["fingerprint"]) != fingerprint(graph):
+                raise ValueError(f"L'index {path} n'a pas été construit pour ce graphe")
+            index = cls(graph, data["landmarks"].tolist(), data["distances"], float(data["build_time"]))
+
+        # Chaque repère doit être à distance nulle de lui-même
+        for k, (line, column) in enumerate(index.landmarks):
+            landmark = graph.get_vertex(line, column)
+            if landmark is None or index.distances[index.indices[landmark], k] != 0:
+                raise ValueError(f"L'index {path} est incohérent pour le repère ({line}, {column})")
+        return index
+
+    @property
+    def nbytes(self):
+        """
+        Retourne:
+            int: La taille des tableaux de distances, en octets
+        """
+        return self.distances.nbytes
+
+    def lower_bound(self, start, finish):
+        """
+        Minore le coût du plus court chemin sans recherche.
+
+        Arguments:
+            start: Vertex - Sommet de départ
+            finish: Vertex - Sommet d'arrivée
+
+        Retourne:
+            float: Un minorant du coût, dans les unités de Graph.dijkstra
+        """
+        return _LandmarkHeuristic(self, finish).get(start, float('inf')) * 255
+
+    def estimate(self, start, finish):
+        """
+        Encadre le coût du plus court chemin en temps proportionnel au nombre de repères.
+
+        Arguments:
+            start: Vertex - Sommet de départ
+            finish: Vertex - Sommet d'arrivée
+
+        Retourne:
+            tuple: Un minorant et un majorant du coût (passage par le meilleur repère)
+        """
+        upper = np.min(self.distances[self.indices[start]] + self.distances[self.indices[finish]])
+        return self.lower_bound(start, finish), float(upper) * 255
+
+    def dijkstra(self, start, finish):
+        """
+        Cherche le plus court chemin exact avec A* guidé par les repères (ALT).
+
+        Arguments:
+            start: Vertex - Sommet de départ
+            finish: Vertex - Sommet d'arrivée
+
+        Retourne:
+            tuple: Le chemin le plus court sous forme de liste de sommets et la distance finale
+        """
+        path, cost = self.graph.astar(start, finish, _LandmarkHeuristic(self, finish))
+        if path is None:
+            return [finish], float('inf')
+        return path, cost * 255
+
+    def report(self, queries):
+        """
+        Mesure ce que rapporte l'index sur des requêtes, pour décider s'il vaut la peine
+        d'être construit pour une image.
+
+        Arguments:
+            queries: list - Couples (sommet de départ, sommet d'arrivée)
+
+        Retourne:
+            dict: Durée de construction et taille de l'index, durées cumulées des requêtes
+            avec Graph.dijkstra, avec ALT et en estimation, et accélération obtenue par ALT
+            par rapport à Graph.dijkstra
+        """
+        timings = {"dijkstra": 0.0, "alt": 0.0, "estimate": 0.0}
+        for start, finish in queries:
+            started = time.perf_counter()
+            self.graph.dijkstra(start, finish)
+            timings["dijkstra"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            self.dijkstra(start, finish)
+            timings["alt"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            self.estimate(start, finish)
+            timings["estimate"] += time.perf_counter() - started
+
+        return {
+            "build_time": self.build_time,
+            "index_size": self.nbytes,
+            "dijkstra_time": timings["dijkstra"],
+            "alt_time": timings["alt"],
+            "estimate_time": timings["estimate"],
+            "speedup": timings["dijkstra"] / timings["alt"] if timings["alt"] else float('inf')
+        }
\ No newline at end of file
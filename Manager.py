@@ -1,11 +1,29 @@
-import cv2 as cv
 from Graph import Graph
+from ImageLoader import read_image
 
 def load_graph(image_path):
-    # Lire l'image en utilisant OpenCV et la redimensionner à une taille fixe (21x21 pixels)
-    img = cv.imread(image_path)
-    height, width = (21, 21)
-    image = cv.resize(img, (height, width))
+    """
+    Construit le graphe d'une image à partir de son chemin.
+
+    Arguments:
+        image_path: str | bytes | numpy.ndarray - Chemin de l'image, ou toute source acceptée par read_image
+
+    Retourne:
+        Graph: Le graphe représentant l'image
+    """
+    return build_graph(read_image(image_path))
+
+def build_graph(image):
+    """
+    Construit le graphe d'une image déjà décodée et redimensionnée.
+
+    Arguments:
+        image: numpy.ndarray - Image au format BGR
+
+    Retourne:
+        Graph: Le graphe représentant l'image
+    """
+    height, width = image.shape[:2]
 
     # Créer une instance de la classe Graph pour représenter l'image sous forme de graphe
     image_graph = Graph()
@@ -13,10 +31,9 @@ def load_graph(image_path):
     # Parcourir chaque pixel de l'image redimensionnée
     for i in range(width):
         for j in range(height):
-            # Extraire les intensités de couleur RGB pour chaque pixel
-            colors = ["B", "G", "R"]
-            intensity = dict(zip(colors, image[j, i]))
-            
+            # L'intensité du pixel est une vue sur le tampon de l'image, sans copie
+            intensity = image[j, i]
+
             # Ajouter un sommet au graphe représentant la position du pixel et ses intensités de couleur
             image_graph.add_vertex(i, j, intensity)
 
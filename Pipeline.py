@@ -0,0 +1,306 @@
+import argparse
+import csv
+import io
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, ALL_COMPLETED, wait
+
+from ImageLoader import read_image
+from Manager import build_graph
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+CSV_FIELDS = ["image", "index", "total", "start", "finish", "cost", "path", "error"]
+
+# Marque la fin de la file de préchargement
+_END = object()
+
+def list_jobs(directory, queries, extensions=IMAGE_EXTENSIONS):
+    """
+    Liste les images d'un dossier qui ont au moins une requête à traiter.
+
+    Arguments:
+        directory: str - Dossier contenant les images
+        queries: dict | callable - Requêtes par nom d'image, ou fonction (chemin -> requêtes)
+        extensions: tuple - Extensions d'images acceptées
+
+    Retourne:
+        generator: Couples (chemin de l'image, liste de couples ((ligne, colonne), (ligne, colonne)))
+    """
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(extensions):
+            continue
+        image_path = os.path.join(directory, name)
+        if callable(queries):
+            pairs = queries(image_path)
+        else:
+            pairs = queries.get(name, [])
+        pairs = [(tuple(start), tuple(finish)) for start, finish in pairs]
+        if pairs:
+            yield image_path, pairs
+
+def decode_images(jobs, prefetch=4):
+    """
+    Décode les images sur un thread dédié à travers une file bornée.
+
+    Au plus `prefetch` images décodées attendent en mémoire, ce qui borne la mémoire
+    utilisée tout en recouvrant les lectures disque avec les calculs.
+
+    Arguments:
+        jobs: iterable - Couples (chemin de l'image, requêtes)
+        prefetch: int - Nombre maximal d'images décodées en attente
+
+    Une erreur levée par `jobs` lui-même (dossier absent, requête mal formée...) arrête
+    la lecture et est relancée chez le consommateur.
+
+    Retourne:
+        generator: Quadruplets (chemin de l'image, requêtes, image ou None, erreur ou None)
+    """
+    buffer = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    failure = []
+
+    def put(item):
+        # Le consommateur peut s'arrêter avant la fin : on ne bloque jamais indéfiniment
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for image_path, pairs in jobs:
+                try:
+                    item = (image_path, pairs, read_image(image_path), None)
+                except Exception as error:
+                    item = (image_path, pairs, None, error)
+                if not put(item):
+                    return
+        except Exception as error:
+            # Sans _END, le consommateur attendrait indéfiniment
+            failure.append(error)
+        put(_END)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                if failure:
+                    raise failure[0]
+                return
+            yield item
+    finally:
+        stop.set()
+
+def solve_image(image, pairs):
+    """
+    Construit le graphe d'une image et calcule le plus court chemin de chaque requête.
+
+    Une requête invalide n'empêche pas de répondre aux autres : son erreur est rendue
+    avec son résultat.
+
+    Arguments:
+        image: numpy.ndarray - Image décodée au format BGR
+        pairs: list - Couples ((ligne, colonne), (ligne, colonne)) de départ et d'arrivée
+
+    Retourne:
+        list: Un triplet (tableau (N, 2) des coordonnées du chemin ou None, coût ou None,
+        message d'erreur ou None) par requête
+    """
+    graph = build_graph(image)
+    results = []
+    for start, finish in pairs:
+        start_vertex = graph.get_vertex(*start)
+        finish_vertex = graph.get_vertex(*finish)
+        if start_vertex is None or finish_vertex is None:
+            results.append((None, None, f"Pixel hors de l'image : {start} -> {finish}"))
+            continue
+        path, cost = graph.shortest_path(start_vertex, finish_vertex)
+        results.append((path, cost, None))
+    return results
+
+def iter_results(jobs, workers=2, prefetch=4):
+    """
+    Résout les requêtes de chaque image et renvoie les résultats au fur et à mesure.
+
+    Le décodage se fait sur un thread, la construction du graphe et la recherche sur
+    `workers` processus, qui ne partagent pas le GIL ; au plus `workers` images sont en
+    cours de traitement à la fois.
+
+    Arguments:
+        jobs: iterable - Couples (chemin de l'image, requêtes)
+        workers: int - Nombre de processus de recherche
+        prefetch: int - Nombre maximal d'images décodées en attente
+
+    Retourne:
+        generator: Quadruplets (chemin de l'image, requêtes, résultats ou None, erreur ou None)
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for image_path, pairs, image, error in decode_images(jobs, prefetch):
+            if error is not None:
+                yield image_path, pairs, None, error
+                continue
+            pending[executor.submit(solve_image, image, pairs)] = (image_path, pairs)
+            if len(pending) >= workers:
+                yield from _drain(pending, FIRST_COMPLETED)
+        yield from _drain(pending, ALL_COMPLETED)
+
+def _drain(pending, return_when):
+    """
+    Renvoie les résultats des tâches terminées et les retire de `pending`.
+    """
+    if not pending:
+        return
+    done, _ = wait(pending, return_when=return_when)
+    for future in done:
+        image_path, pairs = pending.pop(future)
+        error = future.exception()
+        yield image_path, pairs, None if error else future.result(), error
+
+def make_records(image_path, pairs, results, error):
+    """
+    Transforme les résultats d'une image en enregistrements à écrire.
+
+    Une image en erreur (lecture ou calcul impossible) produit un seul enregistrement,
+    sans départ ni arrivée, portant le message d'erreur ; elle sera retentée à la prochaine
+    reprise. Une requête invalide garde son propre enregistrement en erreur, qui n'est pas
+    retenté puisqu'il échouerait de nouveau.
+    """
+    name = os.path.basename(image_path)
+    if error is not None:
+        return [{"image": name, "index": 0, "total": 1, "start": None, "finish": None,
+                 "cost": None, "path": None, "error": str(error).replace("\n", " ")}]
+    records = []
+    for index, ((start, finish), (path, cost, message)) in enumerate(zip(pairs, results)):
+        records.append({
+            "image": name,
+            "index": index,
+            "total": len(pairs),
+            "start": list(start),
+            "finish": list(finish),
+            # Un chemin impossible a un coût infini, qui n'existe pas en JSON
+            "cost": None if cost is None or cost == float('inf') else float(cost),
+            "path": None if path is None else [[int(line), int(column)] for line, column in path],
+            "error": message
+        })
+    return records
+
+def format_records(records, output_format):
+    """
+    Sérialise des enregistrements en lignes JSONL ou CSV.
+    """
+    if output_format == "jsonl":
+        return "".join(json.dumps(record) + "\n" for record in records)
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=CSV_FIELDS, lineterminator="\n")
+    for record in records:
+        writer.writerow({key: value if isinstance(value, (str, int)) or value is None else json.dumps(value)
+                         for key, value in record.items()})
+    return text.getvalue()
+
+def load_completed(output_path, output_format):
+    """
+    Récupère les images déjà traitées entièrement dans un fichier de résultats.
+
+    Les lignes tronquées par un arrêt brutal, les images dont une partie des
+    enregistrements manque et les images en erreur sont retirées du fichier, pour être
+    recalculées. Les requêtes invalides d'une image terminée sont gardées.
+
+    Arguments:
+        output_path: str - Fichier de résultats
+        output_format: str - "jsonl" ou "csv"
+
+    Retourne:
+        set: Noms des images terminées
+    """
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, encoding="utf-8", newline="") as output_file:
+        text = output_file.read()
+    lines = text[:text.rfind("\n") + 1].splitlines(keepends=True)
+    header = []
+    if output_format == "csv" and lines:
+        header, lines = lines[:1], lines[1:]
+
+    entries = []
+    counts = {}
+    for line in lines:
+        try:
+            if output_format == "jsonl":
+                record = json.loads(line)
+            else:
+                record = dict(zip(CSV_FIELDS, next(csv.reader([line]))))
+            image, total = record["image"], int(record["total"])
+        except (ValueError, KeyError, TypeError, StopIteration):
+            continue
+        # Une image en erreur (lecture impossible, erreur passagère...) est retentée ; ses
+        # enregistrements n'ont pas de départ, contrairement à ceux d'une requête invalide
+        if record.get("error") and not record.get("start"):
+            continue
+        entries.append((image, total, line))
+        counts[image] = counts.get(image, 0) + 1
+
+    completed = {image for image, total, _ in entries if counts[image] == total}
+    kept = [line for image, _, line in entries if image in completed]
+    if len(kept) != len(lines) or len(text) != sum(map(len, header + lines)):
+        temporary_path = output_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8", newline="") as output_file:
+            output_file.write("".join(header + kept))
+        os.replace(temporary_path, output_path)
+    return completed
+
+def run_batch(directory, queries, output_path, output_format=None, workers=2, prefetch=4):
+    """
+    Traite toutes les images d'un dossier et écrit les résultats au fil de l'eau.
+
+    Les résultats de chaque image sont ajoutés au fichier dès qu'elle est terminée ;
+    une relance reprend après la dernière image complètement écrite.
+
+    Arguments:
+        directory: str - Dossier contenant les images
+        queries: dict | callable - Requêtes par nom d'image, ou fonction (chemin -> requêtes)
+        output_path: str - Fichier de résultats (.jsonl ou .csv)
+        output_format: str - "jsonl" ou "csv", déduit de l'extension si absent
+        workers: int - Nombre de processus de recherche
+        prefetch: int - Nombre maximal d'images décodées en attente
+
+    Retourne:
+        int: Nombre d'images traitées lors de cet appel
+    """
+    if output_format is None:
+        output_format = "csv" if output_path.lower().endswith(".csv") else "jsonl"
+    completed = load_completed(output_path, output_format)
+    jobs = ((image_path, pairs) for image_path, pairs in list_jobs(directory, queries)
+            if os.path.basename(image_path) not in completed)
+
+    processed = 0
+    with open(output_path, "a", encoding="utf-8", newline="") as output_file:
+        if output_format == "csv" and output_file.tell() == 0:
+            output_file.write(",".join(CSV_FIELDS) + "\n")
+        for image_path, pairs, results, error in iter_results(jobs, workers, prefetch):
+            # Une seule écriture par image, synchronisée sur le disque avant de continuer
+            output_file.write(format_records(make_records(image_path, pairs, results, error), output_format))
+            output_file.flush()
+            os.fsync(output_file.fileno())
+            processed += 1
+    return processed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcule les plus courts chemins pour un dossier d'images.")
+    parser.add_argument("directory", help="Dossier contenant les images")
+    parser.add_argument("queries", help="Fichier JSON : {nom de l'image: [[[ligne, colonne], [ligne, colonne]], ...]}")
+    parser.add_argument("output", help="Fichier de résultats (.jsonl ou .csv)")
+    parser.add_argument("--workers", type=int, default=2, help="Nombre de processus de recherche")
+    parser.add_argument("--prefetch", type=int, default=4)
+    args = parser.parse_args()
+
+    with open(args.queries, encoding="utf-8") as queries_file:
+        queries = json.load(queries_file)
+    count = run_batch(args.directory, queries, args.output, workers=args.workers, prefetch=args.prefetch)
+    print(f"{count} image(s) traitée(s)")
\ No newline at end of file
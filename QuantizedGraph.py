@@ -0,0 +1,212 @@
+import math
+import threading
+import numpy as np
+
+# Poids maximal d'une arête : distance euclidienne entre noir et blanc sur les trois canaux
+MAX_WEIGHT = math.sqrt(3) * 255
+
+class QuantizedGraph:
+    def __init__(self, image, dtype=np.uint16):
+        """
+        Construit une grille dont les poids d'arêtes sont quantifiés sur des entiers 8 ou 16 bits.
+
+        Les coordonnées sont celles de Manager.build_graph : le sommet (ligne, colonne)
+        correspond au pixel image[colonne, ligne].
+
+        Arguments:
+            image: numpy.ndarray - Image au format BGR, telle que renvoyée par read_image
+            dtype: numpy.dtype - np.uint8 ou np.uint16 pour stocker les poids
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in (np.dtype(np.uint8), np.dtype(np.uint16)):
+            raise ValueError(f"Type de poids non supporté : {dtype} (uint8 ou uint16 attendu)")
+
+        # Vue transposée, sans copie, pour indexer les pixels par (ligne, colonne)
+        self.pixels = image.transpose(1, 0, 2)
+        self.shape = self.pixels.shape[:2]
+        # Nombre de niveaux par unité de coût ; un niveau vaut au plus 1 / scale
+        self.scale = np.iinfo(dtype).max / MAX_WEIGHT
+
+        pixels = self.pixels.astype(np.int32)
+        # Poids entre (l, c) et (l + 1, c), puis entre (l, c) et (l, c + 1).
+        # L'arrondi par défaut garantit que le coût quantifié minore le coût exact.
+        self.down = self._quantize(pixels[1:, :] - pixels[:-1, :], dtype)
+        self.right = self._quantize(pixels[:, 1:] - pixels[:, :-1], dtype)
+        # Nombre de seaux de la file : un de plus que le poids maximal
+        self.size = max(int(self.down.max(initial=0)), int(self.right.max(initial=0))) + 1
+        # Distance entière plus grande que toute distance possible : évite un test à None
+        self.unreached = self.size * self.shape[0] * self.shape[1]
+        # Seaux, distances et pères réutilisés d'une recherche à l'autre, un jeu par thread
+        self.local = threading.local()
+
+    def _quantize(self, differences, dtype):
+        """
+        Convertit des différences BGR en poids entiers.
+        """
+        exact = np.sqrt((differences ** 2).sum(axis=2))
+        return np.ascontiguousarray(np.floor(exact * self.scale).astype(dtype))
+
+    @property
+    def nbytes(self):
+        """
+        Retourne:
+            int: La mémoire occupée par les poids, en octets
+        """
+        return self.down.nbytes + self.right.nbytes
+
+    def edge_cost(self, vertex1, vertex2):
+        """
+        Calcule le coût exact (non quantifié) d'une arête, dans les unités de Graph.dijkstra.
+
+        Arguments:
+            vertex1: tuple - Coordonnées (ligne, colonne) du premier sommet
+            vertex2: tuple - Coordonnées (ligne, colonne) du deuxième sommet
+
+        Retourne:
+            float: Le coût de l'arête
+        """
+        difference = self.pixels[vertex1].astype(np.int32) - self.pixels[vertex2].astype(np.int32)
+        return math.sqrt(int((difference ** 2).sum()))
+
+    def dijkstra(self, start, finish):
+        """
+        Cherche le plus court chemin avec une file à seaux (algorithme de Dial).
+
+        Les poids étant des entiers bornés par C, la file est un tableau circulaire de C + 1
+        seaux : chaque sommet est traité en temps constant, sans tas, et les seaux vides sont
+        sautés d'un coup. Les seaux et les distances sont réutilisés d'un appel à l'autre : le
+        coût d'une recherche dépend de la zone explorée et non de la taille de l'image.
+
+        Arguments:
+            start: tuple - Coordonnées (ligne, colonne) du sommet de départ
+            finish: tuple - Coordonnées (ligne, colonne) du sommet d'arrivée
+
+        Retourne:
+            tuple: Le chemin sous forme de liste de coordonnées, son coût exact et l'erreur
+            maximale de ce coût par rapport au plus court chemin exact
+        """
+        lines, columns = self.shape
+        for line, column in (start, finish):
+            if not (0 <= line < lines and 0 <= column < columns):
+                raise ValueError(f"Pixel hors de l'image : ({line}, {column})")
+
+        # Des memoryview évitent de créer un scalaire numpy à chaque lecture de poids
+        down = memoryview(self.down.reshape(-1))
+        right = memoryview(self.right.reshape(-1))
+        size = self.size
+        unreached = self.unreached
+        if not hasattr(self.local, "buckets"):
+            self.local.buckets = [[] for _ in range(size)]
+            # Un octet par seau non vide : bytearray.find saute les seaux vides en C, au lieu
+            # d'avancer d'un niveau de distance à la fois
+            self.local.occupied = bytearray(size)
+            self.local.distances = [unreached] * (lines * columns)
+            self.local.fathers = [-1] * (lines * columns)
+        buckets = self.local.buckets
+        occupied = self.local.occupied
+        distances = self.local.distances
+        fathers = self.local.fathers
+        # Sommets atteints, seuls à remettre à `unreached` à la fin de la recherche
+        reached = []
+
+        source = start[0] * columns + start[1]
+        target = finish[0] * columns + finish[1]
+        distances[source] = 0
+        fathers[source] = -1
+        reached.append(source)
+        buckets[0].append(source)
+        occupied[0] = 1
+        pending = 1
+        current = 0
+        last_line = (lines - 1) * columns
+
+        while pending:
+            slot = current % size
+            found = occupied.find(1, slot)
+            if found < 0:
+                found = occupied.find(1)
+            current += (found - slot) % size
+            bucket = buckets[found]
+            while bucket:
+                vertex = bucket.pop()
+                pending -= 1
+                # Un sommet déjà amélioré depuis son insertion est ignoré
+                if distances[vertex] != current:
+                    continue
+                if vertex == target:
+                    break
+                # Les quatre voisins sont traités sans liste intermédiaire : c'est la boucle la plus chaude
+                line, column = divmod(vertex, columns)
+                if vertex >= columns:
+                    neighbor = vertex - columns
+                    distance = current + down[neighbor]
+                    if distance < distances[neighbor]:
+                        if distances[neighbor] == unreached:
+                            reached.append(neighbor)
+                        distances[neighbor] = distance
+                        fathers[neighbor] = vertex
+                        buckets[distance % size].append(neighbor)
+                        occupied[distance % size] = 1
+                        pending += 1
+                if vertex < last_line:
+                    neighbor = vertex + columns
+                    distance = current + down[vertex]
+                    if distance < distances[neighbor]:
+                        if distances[neighbor] == unreached:
+                            reached.append(neighbor)
+                        distances[neighbor] = distance
+                        fathers[neighbor] = vertex
+                        buckets[distance % size].append(neighbor)
+                        occupied[distance % size] = 1
+                        pending += 1
+                if column > 0:
+                    neighbor = vertex - 1
+                    distance = current + right[vertex - line - 1]
+                    if distance < distances[neighbor]:
+                        if distances[neighbor] == unreached:
+                            reached.append(neighbor)
+                        distances[neighbor] = distance
+                        fathers[neighbor] = vertex
+                        buckets[distance % size].append(neighbor)
+                        occupied[distance % size] = 1
+                        pending += 1
+                if column < columns - 1:
+                    neighbor = vertex + 1
+                    distance = current + right[vertex - line]
+                    if distance < distances[neighbor]:
+                        if distances[neighbor] == unreached:
+                            reached.append(neighbor)
+                        distances[neighbor] = distance
+                        fathers[neighbor] = vertex
+                        buckets[distance % size].append(neighbor)
+                        occupied[distance % size] = 1
+                        pending += 1
+            if not bucket:
+                occupied[found] = 0
+            if distances[target] == current:
+                break
+
+        final = distances[target]
+        path = [target]
+        if final != unreached:
+            while fathers[path[-1]] != -1:
+                path.append(fathers[path[-1]])
+
+        # Remet à zéro ce que la recherche a touché, sans parcourir toute l'image
+        for vertex in reached:
+            distances[vertex] = unreached
+        found = occupied.find(1)
+        while found >= 0:
+            buckets[found].clear()
+            occupied[found] = 0
+            found = occupied.find(1, found + 1)
+
+        if final == unreached:
+            return [finish], float('inf'), 0.0
+        path = [divmod(vertex, columns) for vertex in reversed(path)]
+
+        cost = sum(self.edge_cost(path[k], path[k + 1]) for k in range(len(path) - 1))
+        # Le coût quantifié du chemin trouvé minore celui de tout chemin exact : l'écart
+        # entre les deux borne l'erreur commise
+        lower_bound = final / self.scale
+        return path, cost, max(cost - lower_bound, 0.0)
\ No newline at end of file
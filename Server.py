@@ -0,0 +1,403 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Manager import load_graph
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# Graphes déjà construits dans ce processus (un cache par processus de calcul)
+_GRAPHS = OrderedDict()
+_GRAPHS_LOCK = threading.Lock()
+
+class GraphMissing(Exception):
+    """
+    Le graphe demandé n'est plus dans le cache du processus et l'image n'a pas été envoyée.
+    """
+
+def _solve(key, source, start, finish, cache_size):
+    """
+    Calcule un plus court chemin dans un processus de calcul, en réutilisant le graphe de
+    l'image s'il est déjà en cache.
+
+    Arguments:
+        key: str - Empreinte de l'image
+        source: str | bytes | None - Chemin ou contenu de l'image, lu seulement si le graphe
+            manque ; None si le serveur sait que le graphe est déjà en cache
+        start: tuple - Coordonnées (ligne, colonne) du pixel de départ
+        finish: tuple - Coordonnées (ligne, colonne) du pixel d'arrivée
+        cache_size: int - Nombre maximal de graphes gardés en cache
+
+    Retourne:
+        tuple: Le chemin en coordonnées, son coût (None si impossible), True si le graphe était
+        en cache, et les instants (time.time) de début et de fin du calcul
+    """
+    started = time.time()
+    with _GRAPHS_LOCK:
+        graph = _GRAPHS.get(key)
+        if graph is not None:
+            _GRAPHS.move_to_end(key)
+    hit = graph is not None
+    if not hit:
+        if source is None:
+            raise GraphMissing(key)
+        graph = load_graph(source)
+        with _GRAPHS_LOCK:
+            _GRAPHS[key] = graph
+            while len(_GRAPHS) > cache_size:
+                _GRAPHS.popitem(last=False)
+
+    start_vertex = graph.get_vertex(*start)
+    finish_vertex = graph.get_vertex(*finish)
+    if start_vertex is None or finish_vertex is None:
+        raise ValueError(f"Pixel hors de l'image : {start} -> {finish}")
+    path, cost = graph.shortest_path(start_vertex, finish_vertex)
+    return path.tolist(), None if cost == float('inf') else float(cost), hit, started, time.time()
+
+def _summary(values):
+    """
+    Résume une série de durées en secondes.
+
+    Retourne:
+        dict: Moyenne, médiane, 95e centile et maximum, en millisecondes
+    """
+    values = sorted(values)
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+
+    def percentile(rank):
+        return values[min(int(rank * len(values)), len(values) - 1)] * 1000
+
+    return {"mean": sum(values) / len(values) * 1000, "p50": percentile(0.5),
+            "p95": percentile(0.95), "max": values[-1] * 1000}
+
+class PathServer:
+    def __init__(self, host="127.0.0.1", port=0, socket_path=None, workers=None, cache_size=8, executors=None,
+                 spill=2):
+        """
+        Initialise un serveur HTTP local de plus courts chemins.
+
+        Chaque image est confiée en priorité au même processus de calcul, choisi d'après son
+        empreinte, pour que son graphe reste en cache dans ce processus. Quand ce processus
+        a déjà `spill` calculs en cours ou en attente, la recherche déborde sur un processus
+        moins chargé, au prix d'une construction du graphe de plus : une image très demandée
+        n'est ainsi pas limitée à un seul cœur.
+
+        Arguments:
+            host: str - Adresse d'écoute
+            port: int - Port d'écoute (0 pour un port libre choisi par le système)
+            socket_path: str - Chemin d'une socket Unix à utiliser à la place de TCP
+            workers: int - Nombre de processus de calcul (un par cœur par défaut)
+            cache_size: int - Nombre de graphes gardés en cache par processus
+            executors: list - Exécuteurs à un seul worker à utiliser à la place des processus
+            spill: int - Nombre de calculs en cours ou en attente au-delà duquel un processus déborde
+        """
+        if workers is not None and workers < 1:
+            raise ValueError(f"Nombre de processus invalide : {workers}")
+        if executors is not None and not executors:
+            raise ValueError("Au moins un exécuteur est nécessaire")
+        if spill < 1:
+            raise ValueError(f"Seuil de débordement invalide : {spill}")
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.cache_size = cache_size
+        self.spill = spill
+        self.owns_executors = executors is None
+        if executors is None:
+            executors = [ProcessPoolExecutor(max_workers=1) for _ in range(workers or os.cpu_count() or 1)]
+        self.executors = executors
+        # Copie, côté serveur, du cache LRU de chaque processus : l'image n'est envoyée que
+        # si le processus ne l'a pas déjà
+        self.cached = [OrderedDict() for _ in executors]
+        self.queued = [0] * len(executors)
+        self.server = None
+        self.inflight = dict()
+        self.hashes = OrderedDict()
+        self.latencies = deque(maxlen=1000)
+        self.waits = deque(maxlen=1000)
+        self.searches = deque(maxlen=1000)
+        self.counters = {"requests": 0, "errors": 0, "searches": 0, "coalesced": 0,
+                         "spilled": 0, "cache_hits": 0, "cache_misses": 0}
+
+    async def start(self):
+        """
+        Démarre l'écoute ; le port choisi est ensuite disponible dans self.port.
+        """
+        if self.socket_path:
+            self.server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        else:
+            self.server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """
+        Arrête l'écoute et les processus de calcul.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.owns_executors:
+            for executor in self.executors:
+                executor.shutdown()
+
+    async def _handle(self, reader, writer):
+        """
+        Traite les requêtes HTTP/1.1 d'une connexion, qui peut rester ouverte entre deux requêtes.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                started = time.perf_counter()
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    status, payload, keep_alive = 400, {"error": "Requête HTTP invalide"}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method, target, body)
+
+                self.counters["requests"] += 1
+                if status != 200:
+                    self.counters["errors"] += 1
+                self.latencies.append(time.perf_counter() - started)
+
+                data = json.dumps(payload).encode()
+                writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                              f"Content-Type: application/json\r\n"
+                              f"Content-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        """
+        Aiguille une requête vers la route correspondante.
+
+        Retourne:
+            tuple: Le code HTTP et la réponse à sérialiser en JSON
+        """
+        if target == "/metrics":
+            if method != "GET":
+                return 405, {"error": "Méthode non autorisée"}
+            return 200, self.metrics()
+        if target == "/path":
+            if method != "POST":
+                return 405, {"error": "Méthode non autorisée"}
+            try:
+                return 200, await self._path(json.loads(body or b"{}"))
+            except KeyError as error:
+                return 400, {"error": f"Champ manquant : {error.args[0]}"}
+            except (ValueError, TypeError, OSError) as error:
+                return 400, {"error": str(error)}
+            except Exception as error:
+                return 500, {"error": str(error)}
+        return 404, {"error": f"Route inconnue : {target}"}
+
+    async def _path(self, query):
+        """
+        Résout une requête de plus court chemin.
+
+        La requête JSON contient "start" et "finish" ([ligne, colonne]) et soit "image"
+        (chemin du fichier), soit "data" (contenu de l'image encodé en base64). Des requêtes
+        identiques simultanées partagent une seule recherche.
+        """
+        start = tuple(int(value) for value in query["start"])
+        finish = tuple(int(value) for value in query["finish"])
+        if "image" in query:
+            source = query["image"]
+            key = await self._hash_file(source)
+        elif "data" in query:
+            source = base64.b64decode(query["data"])
+            key = hashlib.sha256(source).hexdigest()
+        else:
+            raise ValueError("La requête doit contenir \"image\" ou \"data\"")
+
+        request_key = (key, start, finish)
+        task = self.inflight.get(request_key)
+        if task is None:
+            task = asyncio.ensure_future(self._search(key, source, start, finish))
+            self.inflight[request_key] = task
+            self.counters["searches"] += 1
+            task.add_done_callback(lambda _: self.inflight.pop(request_key, None))
+        else:
+            self.counters["coalesced"] += 1
+
+        # shield : une connexion fermée ne doit pas annuler la recherche partagée
+        path, cost = await asyncio.shield(task)
+        return {"image": key, "path": path, "cost": cost}
+
+    async def _search(self, key, source, start, finish):
+        """
+        Confie une recherche au processus attitré de l'image, ou à un processus moins chargé
+        s'il est occupé, en n'envoyant l'image que si ce processus ne l'a pas en cache.
+
+        Retourne:
+            tuple: Le chemin en coordonnées et son coût
+        """
+        slot = int(key, 16) % len(self.executors)
+        if self.queued[slot] >= self.spill:
+            idle = [other for other in range(len(self.executors)) if self.queued[other] < self.spill]
+            if idle:
+                # Un processus qui a déjà le graphe évite de le reconstruire
+                slot = min(idle, key=lambda other: (key not in self.cached[other], self.queued[other]))
+                self.counters["spilled"] += 1
+        cached = self.cached[slot]
+        try:
+            result = await self._submit(slot, key, None if key in cached else source, start, finish)
+        except GraphMissing:
+            # La copie du cache s'est écartée de celui du processus : on renvoie l'image
+            result = await self._submit(slot, key, source, start, finish)
+        except Exception:
+            cached.pop(key, None)
+            raise
+        path, cost, hit, _, _ = result
+        self.counters["cache_hits" if hit else "cache_misses"] += 1
+        return path, cost
+
+    async def _submit(self, slot, key, source, start, finish):
+        """
+        Soumet un calcul à un processus et mesure séparément l'attente dans sa file et la durée
+        du calcul.
+        """
+        cached = self.cached[slot]
+        cached[key] = True
+        cached.move_to_end(key)
+        while len(cached) > self.cache_size:
+            cached.popitem(last=False)
+
+        self.queued[slot] += 1
+        submitted = time.time()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executors[slot], _solve, key, source, start, finish, self.cache_size)
+        finally:
+            self.queued[slot] -= 1
+        started, finished = result[3], result[4]
+        self.waits.append(max(started - submitted, 0.0))
+        self.searches.append(finished - started)
+        return result
+
+    async def _hash_file(self, image_path):
+        """
+        Calcule l'empreinte du contenu d'un fichier image. Elle est mémorisée tant que le
+        fichier n'est pas modifié, pour ne pas le relire à chaque requête.
+        """
+        stat = os.stat(image_path)
+        signature = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        key = self.hashes.get(signature)
+        if key is None:
+            def digest():
+                with open(image_path, "rb") as image_file:
+                    return hashlib.sha256(image_file.read()).hexdigest()
+            key = await asyncio.get_running_loop().run_in_executor(None, digest)
+            self.hashes[signature] = key
+            while len(self.hashes) > 1024:
+                self.hashes.popitem(last=False)
+        return key
+
+    def metrics(self):
+        """
+        Retourne:
+            dict: Compteurs de requêtes, recherches en cours, calculs en file par processus,
+            et, sur les 1000 derniers relevés, latence des requêtes, attente en file (de la
+            soumission au début du calcul) et durée des calculs, en millisecondes
+        """
+        return dict(self.counters,
+                    in_flight=len(self.inflight),
+                    queued=list(self.queued),
+                    latency_ms=_summary(self.latencies),
+                    queue_wait_ms=_summary(self.waits),
+                    search_ms=_summary(self.searches))
+
+async def request(method, target, payload=None, host="127.0.0.1", port=80, socket_path=None):
+    """
+    Envoie une requête au serveur, sans dépendance extérieure (utile pour les tests).
+
+    Arguments:
+        method: str - Méthode HTTP
+        target: str - Route ("/path" ou "/metrics")
+        payload: dict - Corps JSON de la requête
+        host: str - Adresse du serveur
+        port: int - Port du serveur
+        socket_path: str - Chemin de la socket Unix du serveur, à la place de TCP
+
+    Retourne:
+        tuple: Le code HTTP et la réponse JSON décodée
+    """
+    if socket_path:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write((f"{method} {target} HTTP/1.1\r\nHost: {host}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                  f"Connection: close\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length)
+    writer.close()
+    await writer.wait_closed()
+    return status, json.loads(data)
+
+async def serve(host, port, socket_path, workers, cache_size, spill):
+    """
+    Démarre le serveur et l'exécute jusqu'à son interruption.
+    """
+    server = PathServer(host, port, socket_path, workers, cache_size, spill=spill)
+    await server.start()
+    print(f"Serveur à l'écoute sur {socket_path or f'http://{host}:{server.port}'}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur HTTP local de plus courts chemins.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--socket", help="Chemin d'une socket Unix à utiliser à la place de TCP")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-size", type=int, default=8)
+    parser.add_argument("--spill", type=int, default=2,
+                        help="Calculs en attente au-delà desquels une image déborde sur un autre processus")
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers doit être au moins 1")
+    if args.spill < 1:
+        parser.error("--spill doit être au moins 1")
+    asyncio.run(serve(args.host, args.port, args.socket, args.workers, args.cache_size, args.spill))
\ No newline at end of file
@@ -6,12 +6,14 @@ class Vertex:
         Arguments:
             line; int - Le numéro de ligne du pixel.
             column: int - Le numéro de colonne du pixel.
-            intensite: dict - Dictionnaire représentant l'intensité du pixel au format BGR.
+            intensite: dict | numpy.ndarray - Intensité du pixel au format BGR (dictionnaire ou vue sur le tampon de l'image).
         """
         self.line = line
         self.column = column
         self.intensity = intensity
         self.neighbors = list()
+        # Position dans la liste des sommets du graphe, fixée par Graph.add_vertex
+        self.index = None
 
     def add_neighbor(self, vertex):
         """
@@ -1,9 +1,8 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QScrollArea
 
-import cv2
-
-from Manager import load_graph
+from ImageLoader import read_image
+from Manager import build_graph
 
 class ClickableImageLabel(QtWidgets.QLabel):
     """
@@ -166,6 +165,7 @@ class Ui_MainWindow(object):
         Initialise les variables stockantles information sur le chemin vers l'image, le graph résultant, les pixels de début et de fin et plus court chemin
         """
         self.image_path = None
+        self.image = None
         self.graph = None
         self.start_pixel = None
         self.end_pixel = None
@@ -484,6 +484,7 @@ class Ui_MainWindow(object):
         """
         self.verticalStackedWidget.setCurrentIndex(0)
         self.graph = None
+        self.image = None
         self.image_path = None
         self.taskMessageLabel.setText("Séléctionner le pixel de départ")
         self.pathLabel.setText("")
@@ -515,14 +516,18 @@ class Ui_MainWindow(object):
         """
         Charge l'image sélectionnée et l'affiche
         """
-        image = cv2.imread(image_path)
-        resized_image = cv2.resize(image, (21, 21))
-
-        self.graph = load_graph(self.image_path)
-
-        q_image = QtGui.QImage(resized_image.data, resized_image.shape[1], resized_image.shape[0], resized_image.strides[0], QtGui.QImage.Format_RGB888)
-        
-        pixmap = QtGui.QPixmap.fromImage(q_image.rgbSwapped())
+        # L'image est décodée une seule fois : le graphe et l'affichage partagent le même tampon
+        self.image = read_image(image_path)
+        self.graph = build_graph(self.image)
+
+        height, width = self.image.shape[:2]
+        if hasattr(QtGui.QImage, "Format_BGR888"):
+            # Qt >= 5.14 lit directement le BGR d'OpenCV, sans conversion intermédiaire
+            q_image = QtGui.QImage(self.image.data, width, height, self.image.strides[0], QtGui.QImage.Format_BGR888)
+        else:
+            q_image = QtGui.QImage(self.image.data, width, height, self.image.strides[0], QtGui.QImage.Format_RGB888).rgbSwapped()
+
+        pixmap = QtGui.QPixmap.fromImage(q_image)
 
         zoom_factor = 30  # Increase this value to zoom in further
         zoomed_pixmap = pixmap.scaled(pixmap.width() * zoom_factor, pixmap.height() * zoom_factor, QtCore.Qt.KeepAspectRatio)
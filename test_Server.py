@@ -0,0 +1,66 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+
+from Server import PathServer, request
+
+class PathServerTest(unittest.IsolatedAsyncioTestCase):
+    """
+    Teste le serveur contre le client local Server.request, sans service extérieur.
+    """
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.image_path = os.path.join(self.directory.name, "image.png")
+        cv.imwrite(self.image_path, np.random.default_rng(0).integers(0, 256, (21, 21, 3), dtype=np.uint8))
+        self.executor = ThreadPoolExecutor(1)
+        self.server = PathServer(port=0, executors=[self.executor])
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.executor.shutdown()
+        self.directory.cleanup()
+
+    async def test_identical_requests_share_one_search(self):
+        # Le seul worker est bloqué tant que toutes les requêtes ne sont pas arrivées
+        release = threading.Event()
+        self.executor.submit(release.wait)
+        query = {"image": self.image_path, "start": [0, 0], "finish": [20, 20]}
+        responses = asyncio.gather(*[request("POST", "/path", query, port=self.server.port) for _ in range(5)])
+        while self.server.counters["searches"] + self.server.counters["coalesced"] < 5:
+            await asyncio.sleep(0.01)
+        release.set()
+
+        responses = await responses
+        self.assertTrue(all(status == 200 for status, _ in responses))
+        self.assertEqual(len({str(payload) for _, payload in responses}), 1)
+        self.assertEqual(self.server.counters["searches"], 1)
+        self.assertGreater(self.server.counters["coalesced"], 0)
+
+    async def test_pixel_outside_image_is_rejected(self):
+        status, payload = await request("POST", "/path", {"image": self.image_path, "start": [0, 0], "finish": [50, 50]},
+                                        port=self.server.port)
+        self.assertEqual(status, 400)
+        self.assertIn("error", payload)
+
+    async def test_metrics(self):
+        await request("POST", "/path", {"image": self.image_path, "start": [0, 0], "finish": [5, 5]}, port=self.server.port)
+        status, metrics = await request("GET", "/metrics", port=self.server.port)
+        self.assertEqual(status, 200)
+        for field in ("requests", "errors", "searches", "coalesced", "spilled", "cache_hits", "cache_misses",
+                      "in_flight", "queued"):
+            self.assertIn(field, metrics)
+        for field in ("latency_ms", "queue_wait_ms", "search_ms"):
+            self.assertEqual(set(metrics[field]), {"mean", "p50", "p95", "max"})
+        self.assertEqual(metrics["requests"], 1)
+        # Les exécuteurs à threads partagent le cache de graphes du module entre les tests
+        self.assertEqual(metrics["cache_hits"] + metrics["cache_misses"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file